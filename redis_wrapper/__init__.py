@@ -1,4 +1,12 @@
-__all__ = ["RegisterRedis", "RedisCache"]
+__all__ = [
+    "RegisterRedis",
+    "RedisCache",
+    "RateLimitResult",
+    "RedisLock",
+    "LockError",
+]
 
 from .client import RedisCache
+from .lock import LockError, RedisLock
+from .rate_limit import RateLimitResult
 from .register_redis_connection import RegisterRedis
@@ -3,6 +3,8 @@ import ujson as json
 from redis_wrapper.utils import RedisLogger
 
 from .cache_hosts import cache_hosts
+from .lock import RedisLock
+from .rate_limit import SLIDING_WINDOW, RateLimitResult
 
 
 class RedisCache:
@@ -443,3 +445,67 @@ class RedisCache:
         """
         result = await cache_hosts[cls._host].exists(cls.prefixed_key(key))
         return result
+
+    @classmethod
+    def lock(cls, name, ttl, blocking_timeout=None, auto_extend=True):
+        """
+        Distributed lock to be used as ``async with RedisCache.lock(name, ttl) as lock``.
+        Waiters are woken up through pub/sub when the lock is released, and the lease
+        is extended in the background while the lock is held.
+        lock.fence holds a counter that increases on every acquisition, pass it along
+        with writes to reject updates from holders whose lease already expired.
+        :param name: String
+        :param ttl: lease time in seconds
+        :param blocking_timeout: seconds to wait for the lock, None waits forever, 0 does not wait
+        :param auto_extend: keep extending the lease while the lock is held
+        :return: RedisLock, raises LockError on entering when it could not be acquired
+        """
+        return RedisLock(
+            cache_hosts[cls._host],
+            cls.prefixed_key(name),
+            ttl,
+            blocking_timeout=blocking_timeout,
+            auto_extend=auto_extend,
+        )
+
+    @classmethod
+    @RedisLogger.log
+    async def rate_limit(cls, key, limit: int, window, algo=SLIDING_WINDOW, cost=1):
+        """
+        Checks the limit for key and consumes cost from it in a single atomic call.
+        Counters expire on their own, there is no need to call expire afterwards.
+        :param key: String
+        :param limit: Integer, allowed requests per window (bucket size for token_bucket)
+        :param window: window length in seconds, token_bucket refills limit tokens per window
+        :param algo: "sliding_window", "token_bucket" or "fixed"
+        :param cost: Integer, amount consumed by this request
+        :return: RateLimitResult(allowed, remaining, reset_ms)
+        """
+        result = await cache_hosts[cls._host].rate_limit(
+            [(cls.prefixed_key(key), limit, window, algo, cost)]
+        )
+        return cls._rate_limit_result(result[0])
+
+    @classmethod
+    @RedisLogger.log
+    async def rate_limit_many(cls, limits: list):
+        """
+        Checks several limits in one round trip. The request is only counted
+        against the limits when all of them allow it, so the request should be
+        rejected unless every result is allowed.
+        :param limits: list of (key, limit, window) or (key, limit, window, algo) or
+        (key, limit, window, algo, cost) tuples
+        :return: list of RateLimitResult ordered identically to limits
+        """
+        checks = []
+        for key, limit, window, *rest in limits:
+            algo = rest[0] if rest else SLIDING_WINDOW
+            cost = rest[1] if len(rest) > 1 else 1
+            checks.append((cls.prefixed_key(key), limit, window, algo, cost))
+        result = await cache_hosts[cls._host].rate_limit(checks)
+        return [cls._rate_limit_result(item) for item in result]
+
+    @staticmethod
+    def _rate_limit_result(item):
+        allowed, remaining, reset_ms = item
+        return RateLimitResult(bool(allowed), int(remaining), int(reset_ms))
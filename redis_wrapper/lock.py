@@ -0,0 +1,178 @@
+import asyncio
+import uuid
+
+from redis_wrapper.log import logger
+
+# Takes the lock when it is free and hands out the next fencing token.
+# When the lock is held, returns its remaining ttl so waiters know how long
+# they may have to wait if the holder dies without releasing it.
+ACQUIRE_LOCK_SCRIPT = """
+if redis.call("SET", KEYS[1], ARGV[1], "NX", "PX", ARGV[2]) then
+    return {1, redis.call("INCR", KEYS[2])}
+end
+return {0, redis.call("PTTL", KEYS[1])}
+"""
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("DEL", KEYS[1])
+    redis.call("PUBLISH", ARGV[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+EXTEND_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Used when the lock disappeared between two checks without a release
+# message, e.g. because it expired.
+_RETRY_DELAY = 0.01
+
+
+class LockError(Exception):
+    pass
+
+
+class RedisLock:
+    """
+    Distributed lock with token based release. Waiters subscribe to a release
+    channel and are woken up as soon as the holder releases the lock instead of
+    polling redis. Use it through RedisCache.lock:
+
+        async with MyCache.lock("order:1", ttl=10, blocking_timeout=5) as lock:
+            await write_with_fence(lock.fence)
+    """
+
+    def __init__(self, backend, name, ttl, blocking_timeout=None, auto_extend=True):
+        """
+        :param backend: RedisWrapper the lock lives on
+        :param name: String, already prefixed key of the lock
+        :param ttl: lease time in seconds
+        :param blocking_timeout: seconds to wait for the lock, None waits forever, 0 does not wait
+        :param auto_extend: keep extending the lease while the lock is held
+        """
+        self._backend = backend
+        self.name = name
+        self.ttl = ttl
+        self.blocking_timeout = blocking_timeout
+        self.auto_extend = auto_extend
+        self.token = uuid.uuid4().hex
+        self.fence = None
+        self.lost = False
+        self._fence_key = name + ":fence"
+        self._channel = name + ":released"
+        self._extend_task = None
+
+    @property
+    def _ttl_ms(self):
+        return int(self.ttl * 1000)
+
+    async def _try_acquire(self):
+        acquired, value = await self._backend.acquire_lock(
+            self.name, self._fence_key, self.token, self._ttl_ms
+        )
+        if acquired:
+            self.fence = value
+            self.lost = False
+            if self.auto_extend:
+                self._extend_task = asyncio.ensure_future(self._extend_forever())
+        return acquired, value
+
+    async def acquire(self):
+        """
+        Acquire the lock, waiting up to blocking_timeout seconds
+        :return: True if the lock was acquired, False on timeout
+        """
+        acquired, _ = await self._try_acquire()
+        if acquired:
+            return True
+        if self.blocking_timeout == 0:
+            return False
+
+        loop = asyncio.get_event_loop()
+        deadline = None
+        if self.blocking_timeout is not None:
+            deadline = loop.time() + self.blocking_timeout
+        pubsub = self._backend.pubsub()
+        await pubsub.subscribe(self._channel)
+        try:
+            while True:
+                # Retry after subscribing, a release published before the
+                # subscription would otherwise go unnoticed.
+                acquired, pttl = await self._try_acquire()
+                if acquired:
+                    return True
+                wait = pttl / 1000 if pttl > 0 else _RETRY_DELAY
+                if deadline is not None:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        return False
+                    wait = min(wait, remaining)
+                await self._wait_for_release(pubsub, wait)
+        finally:
+            await pubsub.unsubscribe(self._channel)
+            await pubsub.reset()
+
+    @staticmethod
+    async def _wait_for_release(pubsub, timeout):
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=remaining
+            )
+            if message is not None:
+                return
+
+    async def _extend_forever(self):
+        interval = self.ttl / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                extended = await self._backend.extend_lock(
+                    self.name, self.token, self._ttl_ms
+                )
+            except Exception as error:
+                logger.warning("Failed to extend lock %s: %s", self.name, error)
+                continue
+            if not extended:
+                self.lost = True
+                logger.warning("Lock %s was lost before it was released", self.name)
+                return
+
+    async def extend(self, ttl=None):
+        """
+        Reset the lease of a held lock
+        :param ttl: new lease time in seconds, defaults to the ttl of the lock
+        :return: True if the lock is still held by us
+        """
+        ttl_ms = self._ttl_ms if ttl is None else int(ttl * 1000)
+        return bool(await self._backend.extend_lock(self.name, self.token, ttl_ms))
+
+    async def release(self):
+        """
+        Release the lock if it is still held by us and wake up the waiters
+        :return: True if the lock was released, False if it had already expired
+        """
+        if self._extend_task is not None:
+            self._extend_task.cancel()
+            self._extend_task = None
+        return bool(
+            await self._backend.release_lock(self.name, self.token, self._channel)
+        )
+
+    async def __aenter__(self):
+        if not await self.acquire():
+            raise LockError(f"Could not acquire lock {self.name}")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.release()
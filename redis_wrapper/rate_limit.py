@@ -0,0 +1,130 @@
+from typing import NamedTuple
+
+FIXED_WINDOW = "fixed"
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+RATE_LIMIT_ALGORITHMS = (FIXED_WINDOW, SLIDING_WINDOW, TOKEN_BUCKET)
+
+
+class RateLimitResult(NamedTuple):
+    allowed: bool
+    remaining: int
+    reset_ms: int
+
+
+# Checks every limit passed in KEYS/ARGV and only consumes from them when all of
+# them allow the request, so a denied request never eats into the other limits.
+# ARGV holds four values per key: algorithm, limit, window in ms and cost.
+# Returns one {allowed, remaining, reset_ms} triple per key.
+RATE_LIMIT_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local all_allowed = true
+local checks = {}
+
+for i, key in ipairs(KEYS) do
+    local base = (i - 1) * 4
+    local algo = ARGV[base + 1]
+    local limit = tonumber(ARGV[base + 2])
+    local window = tonumber(ARGV[base + 3])
+    local cost = tonumber(ARGV[base + 4])
+    local check = {key = key, algo = algo, window = window, cost = cost}
+
+    if algo == "fixed" then
+        local count = tonumber(redis.call("GET", key) or "0")
+        local ttl = redis.call("PTTL", key)
+        check.fresh = ttl < 0
+        if check.fresh then
+            count = 0
+            ttl = window
+        end
+        check.level = limit - count
+        check.reset = ttl
+    elseif algo == "sliding_window" then
+        local data = redis.call("HMGET", key, "w", "c", "p")
+        local index = math.floor(now / window)
+        local current = tonumber(data[2]) or 0
+        local previous = tonumber(data[3]) or 0
+        local stored_index = tonumber(data[1])
+        if stored_index == index - 1 then
+            previous = current
+            current = 0
+        elseif stored_index ~= index then
+            previous = 0
+            current = 0
+        end
+        local elapsed = now - index * window
+        check.index = index
+        check.current = current
+        check.previous = previous
+        check.level = limit - (previous * (window - elapsed) / window + current)
+        check.reset = window - elapsed
+    else
+        local data = redis.call("HMGET", key, "t", "ts")
+        local rate = limit / window
+        local tokens = tonumber(data[1])
+        local updated_at = tonumber(data[2])
+        if tokens == nil or updated_at == nil then
+            tokens = limit
+        else
+            tokens = math.min(limit, tokens + math.max(0, now - updated_at) * rate)
+        end
+        check.limit = limit
+        check.rate = rate
+        check.level = tokens
+        check.reset = (limit - tokens) / rate
+    end
+
+    check.allowed = check.level >= cost
+    if not check.allowed then
+        all_allowed = false
+    end
+    checks[i] = check
+end
+
+local results = {}
+for i, check in ipairs(checks) do
+    local level = check.level
+    local reset = check.reset
+    if all_allowed then
+        level = level - check.cost
+        if check.algo == "fixed" then
+            if check.fresh then
+                redis.call("SET", check.key, check.cost, "PX", check.window)
+            else
+                redis.call("INCRBY", check.key, check.cost)
+            end
+        elseif check.algo == "sliding_window" then
+            redis.call("HSET", check.key, "w", check.index, "c", check.current + check.cost, "p", check.previous)
+            redis.call("PEXPIRE", check.key, check.window * 2)
+        else
+            redis.call("HSET", check.key, "t", level, "ts", now)
+            redis.call("PEXPIRE", check.key, check.window)
+            reset = (check.limit - level) / check.rate
+        end
+    end
+    results[i] = {check.allowed and 1 or 0, math.max(0, math.floor(level)), math.ceil(reset)}
+end
+return results
+"""
+
+
+def rate_limit_args(limits):
+    """
+    Flattens ``(key, limit, window, algo, cost)`` tuples into the KEYS and ARGV
+    lists expected by RATE_LIMIT_SCRIPT
+    :param limits: list of tuples, window in seconds
+    :return: tuple of (keys, args)
+    """
+    keys, args = [], []
+    for key, limit, window, algo, cost in limits:
+        if algo not in RATE_LIMIT_ALGORITHMS:
+            raise ValueError(
+                f"Unknown rate limit algorithm {algo}, use one of {RATE_LIMIT_ALGORITHMS}"
+            )
+        if window <= 0:
+            raise ValueError("Rate limit window must be greater than 0")
+        keys.append(key)
+        args.extend((algo, limit, int(window * 1000), cost))
+    return keys, args
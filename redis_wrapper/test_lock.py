@@ -0,0 +1,75 @@
+import asyncio
+
+import aiounittest
+import fakeredis.aioredis
+
+from .cache_hosts import cache_hosts
+from .client import RedisCache
+from .lock import LockError
+from .wrapper import RedisWrapper
+
+
+class TestLock(aiounittest.AsyncTestCase):
+    def setUp(self):
+        self.redis = RedisWrapper(
+            "localhost", 6544, conn=fakeredis.aioredis.FakeRedis()
+        )
+        RedisCache._host = "global"
+        cache_hosts["global"] = self.redis
+
+    def tearDown(self):
+        del self.redis
+
+    async def test_lock_and_release(self):
+        async with RedisCache.lock("order", ttl=5) as lock:
+            self.assertTrue(await RedisCache.is_key_exist("order"))
+            self.assertEqual(lock.fence, 1)
+        self.assertFalse(await RedisCache.is_key_exist("order"))
+
+    async def test_fence_increases(self):
+        async with RedisCache.lock("order", ttl=5) as first:
+            pass
+        async with RedisCache.lock("order", ttl=5) as second:
+            pass
+        self.assertGreater(second.fence, first.fence)
+
+    async def test_non_blocking_lock_held(self):
+        async with RedisCache.lock("order", ttl=5):
+            with self.assertRaises(LockError):
+                async with RedisCache.lock("order", ttl=5, blocking_timeout=0):
+                    pass
+
+    async def test_blocking_timeout(self):
+        async with RedisCache.lock("order", ttl=5):
+            lock = RedisCache.lock("order", ttl=5, blocking_timeout=0.2)
+            self.assertFalse(await lock.acquire())
+
+    async def test_waiter_woken_on_release(self):
+        holder = RedisCache.lock("order", ttl=30)
+        await holder.acquire()
+        loop = asyncio.get_event_loop()
+
+        async def wait_for_lock():
+            async with RedisCache.lock("order", ttl=5, blocking_timeout=10):
+                return loop.time()
+
+        waiter = asyncio.ensure_future(wait_for_lock())
+        await asyncio.sleep(0.1)
+        released_at = loop.time()
+        await holder.release()
+        acquired_at = await waiter
+        # The holder's lease is 30s, so the waiter can only be this quick when woken up.
+        self.assertLess(acquired_at - released_at, 1)
+
+    async def test_release_with_other_token(self):
+        lock = RedisCache.lock("order", ttl=5)
+        await lock.acquire()
+        other = RedisCache.lock("order", ttl=5)
+        self.assertFalse(await other.release())
+        self.assertTrue(await lock.release())
+
+    async def test_auto_extend(self):
+        async with RedisCache.lock("order", ttl=0.3) as lock:
+            await asyncio.sleep(0.5)
+            self.assertFalse(lock.lost)
+            self.assertTrue(await RedisCache.is_key_exist("order"))
@@ -0,0 +1,74 @@
+import asyncio
+
+import aiounittest
+import fakeredis.aioredis
+
+from .cache_hosts import cache_hosts
+from .client import RedisCache
+from .rate_limit import FIXED_WINDOW, SLIDING_WINDOW, TOKEN_BUCKET
+from .wrapper import RedisWrapper
+
+
+class TestRateLimit(aiounittest.AsyncTestCase):
+    def setUp(self):
+        self.redis = RedisWrapper(
+            "localhost", 6544, conn=fakeredis.aioredis.FakeRedis()
+        )
+        RedisCache._host = "global"
+        cache_hosts["global"] = self.redis
+
+    def tearDown(self):
+        del self.redis
+
+    async def _consume(self, algo, count):
+        return [
+            await RedisCache.rate_limit("api", 3, 10, algo=algo) for _ in range(count)
+        ]
+
+    async def test_fixed_window(self):
+        results = await self._consume(FIXED_WINDOW, 4)
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual([r.remaining for r in results], [2, 1, 0, 0])
+        self.assertTrue(0 < results[-1].reset_ms <= 10000)
+
+    async def test_fixed_window_sets_expiry(self):
+        await RedisCache.rate_limit("api", 3, 10, algo=FIXED_WINDOW)
+        redis = await self.redis.get_redis_connection()
+        self.assertTrue(0 < await redis.pttl("service:base:api") <= 10000)
+
+    async def test_sliding_window(self):
+        results = await self._consume(SLIDING_WINDOW, 4)
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertEqual(results[2].remaining, 0)
+
+    async def test_token_bucket(self):
+        results = await self._consume(TOKEN_BUCKET, 4)
+        self.assertEqual([r.allowed for r in results], [True, True, True, False])
+        self.assertTrue(results[-1].reset_ms > 0)
+
+    async def test_token_bucket_refills(self):
+        for _ in range(2):
+            await RedisCache.rate_limit("api", 2, 1, algo=TOKEN_BUCKET)
+        self.assertFalse((await RedisCache.rate_limit("api", 2, 1, TOKEN_BUCKET)).allowed)
+        await asyncio.sleep(0.6)
+        self.assertTrue((await RedisCache.rate_limit("api", 2, 1, TOKEN_BUCKET)).allowed)
+
+    async def test_rate_limit_many_denied_consumes_nothing(self):
+        await RedisCache.rate_limit("user", 1, 10, algo=FIXED_WINDOW)
+        results = await RedisCache.rate_limit_many(
+            [("ip", 5, 10, FIXED_WINDOW), ("user", 1, 10, FIXED_WINDOW)]
+        )
+        self.assertEqual([r.allowed for r in results], [True, False])
+        ip = await RedisCache.rate_limit("ip", 5, 10, algo=FIXED_WINDOW)
+        self.assertEqual(ip.remaining, 4)
+
+    async def test_rate_limit_many_mixed_algorithms(self):
+        results = await RedisCache.rate_limit_many(
+            [("a", 5, 10), ("b", 5, 10, TOKEN_BUCKET), ("c", 5, 10, FIXED_WINDOW, 2)]
+        )
+        self.assertTrue(all(r.allowed for r in results))
+        self.assertEqual([r.remaining for r in results], [4, 4, 3])
+
+    async def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            await RedisCache.rate_limit("api", 3, 10, algo="leaky")
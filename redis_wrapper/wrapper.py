@@ -1,18 +1,25 @@
 import aioredis
 
+from .lock import ACQUIRE_LOCK_SCRIPT, EXTEND_LOCK_SCRIPT, RELEASE_LOCK_SCRIPT
+from .rate_limit import RATE_LIMIT_SCRIPT, rate_limit_args
+
 
 class RedisWrapper:
     def __init__(self, host, port, conn=None):
         self._host = host
         self._port = port
         self._redis_connection = conn
+        self._scripts = {}
 
-    async def get_redis_connection(self):
+    def _get_client(self):
         if not self._redis_connection:
-            self._redis_connection = await aioredis.from_url(
+            self._redis_connection = aioredis.from_url(
                 "redis://{}:{}".format(self._host, self._port), decode_responses=True
             )
-        return await self._redis_connection
+        return self._redis_connection
+
+    async def get_redis_connection(self):
+        return await self._get_client()
 
     async def sadd(self, key, value, namespace=None):
         if namespace is not None:
@@ -172,6 +179,50 @@ class RedisWrapper:
         redis = await self.get_redis_connection()
         return await redis.eval(script, numkeys, *keys_and_args)
 
+    async def run_script(self, script, keys=(), args=()):
+        """
+        Runs a lua script through EVALSHA, loading it on the server only when it is
+        not cached there yet, so the script body is not sent on every call
+        :param script: lua source
+        :param keys: list of keys
+        :param args: list of args
+        :return: script result
+        """
+        redis = await self.get_redis_connection()
+        registered = self._scripts.get(script)
+        if registered is None:
+            registered = self._scripts[script] = redis.register_script(script)
+        return await registered(keys=keys, args=args)
+
+    async def rate_limit(self, limits):
+        """
+        Checks and consumes all limits in one atomic call
+        :param limits: list of (key, limit, window, algo, cost) tuples, window in seconds
+        :return: list of (allowed, remaining, reset_ms) lists
+        """
+        keys, args = rate_limit_args(limits)
+        return await self.run_script(RATE_LIMIT_SCRIPT, keys, args)
+
+    async def acquire_lock(self, key, fence_key, token, ttl_ms):
+        """
+        :return: (1, fencing token) if the lock was taken, (0, remaining ttl in ms) otherwise
+        """
+        return await self.run_script(
+            ACQUIRE_LOCK_SCRIPT, (key, fence_key), (token, ttl_ms)
+        )
+
+    async def release_lock(self, key, token, channel):
+        return await self.run_script(RELEASE_LOCK_SCRIPT, (key,), (token, channel))
+
+    async def extend_lock(self, key, token, ttl_ms):
+        return await self.run_script(EXTEND_LOCK_SCRIPT, (key,), (token, ttl_ms))
+
+    def pubsub(self):
+        """
+        Returns a PubSub object, it holds a dedicated connection until reset
+        """
+        return self._get_client().pubsub()
+
     async def expire(self, key, timeout):
         redis = await self.get_redis_connection()
         await redis.expire(key, timeout)